@@ -1,8 +1,10 @@
 # api/main.py
 
+import asyncio
 import os
-from fastapi import FastAPI, Depends, HTTPException, status
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, HTTPException, status
+from typing import List, Dict, Any, Optional
 
 from core.question_service import QuestionService
 from qdrant_client import QdrantClient
@@ -17,43 +19,69 @@ if not os.getenv("GEMINI_API_KEY"):
 # 1. INICIALIZAÇÃO DOS CLIENTES E SERVIÇOS 
 # ----------------------------------------------------
 
-# Cria o cliente Qdrant In-Memory
-qdrant_client = QdrantClient(":memory:")
-
-# Inicializa o QuestionService. Isso dispara todo o processo de DB/Qdrant/Indexação.
-question_service = QuestionService(qdrant_client=qdrant_client)
+# Cria o cliente Qdrant local persistente: o índice sobrevive a reinícios,
+# então a carga inicial (embeddings + indexação) só roda até ser concluída uma vez.
+QDRANT_PATH = os.getenv("QDRANT_PATH", "./qdrant_storage")
+qdrant_client = QdrantClient(path=QDRANT_PATH)
+
+# O QuestionService é criado no lifespan da aplicação (e não na importação do módulo).
+# Os endpoints o referenciam diretamente: o servidor só aceita requisições após o startup do lifespan.
+question_service: Optional[QuestionService] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicializa DB/Qdrant antes de aceitar requisições e dispara a indexação inicial em background,
+    para que o servidor responda (ex.: health check em '/') enquanto os embeddings são gerados.
+    """
+    global question_service
+    question_service = QuestionService(
+        qdrant_client=qdrant_client,
+        # O registro da carga inicial acompanha o índice: apagar o diretório do Qdrant refaz a carga
+        load_marker_path=os.path.join(QDRANT_PATH, "initial_load.jsonl")
+    )
+    indexing_task = asyncio.create_task(question_service.load_initial_data())
+    
+    yield
+    
+    # Espera a indexação terminar de cancelar (o bloco em gravação é concluído) antes de fechar o cliente
+    indexing_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await indexing_task
+    qdrant_client.close()
 
 # Inicialização da Aplicação FastAPI
 app = FastAPI(
     title="Teachy ENEM RAG API",
     description="API de Busca por Similaridade Semântica de Questões do ENEM.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ----------------------------------------------------
-# 2. FUNÇÃO DE DEPENDÊNCIA (Para endpoints)
+# 2. ENDPOINTS DA API
 # ----------------------------------------------------
 
-def get_question_service() -> QuestionService:
-    return question_service
-
-# ----------------------------------------------------
-# 3. ENDPOINTS DA API
-# ----------------------------------------------------
+@app.get("/", tags=["Status"], response_model=Dict[str, Any])
+def health_check_endpoint():
+    """Readiness check: retorna 503 enquanto a indexação inicial não terminar."""
+    if question_service is None or not question_service.is_ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Indexação inicial em andamento."
+        )
+    return {"status": "ok"}
 
 @app.get("/status/count", tags=["Status"], response_model=Dict[str, Any])
-def get_collection_count_endpoint(
-    service: QuestionService = Depends(get_question_service)
-):
+def get_collection_count_endpoint():
     """Retorna o número atual de questões indexadas no Qdrant."""
-    count = service.get_collection_count()
-    return {"collection_name": service.collection_name, "count": count}
+    count = question_service.get_collection_count()
+    return {"collection_name": question_service.collection_name, "count": count}
 
 @app.get("/questions", tags=["Questions"], response_model=List[QuestionTopic])
 def search_questions_endpoint(
     topic: str, 
     amount: int = 15, # <--- NOVO PADRÃO: 15
-    service: QuestionService = Depends(get_question_service)
 ):
     """Busca questões do ENEM por similaridade semântica (RAG)."""
     
@@ -68,7 +96,7 @@ def search_questions_endpoint(
         )
 
     try:
-        results = service.search_questions(topic=topic, amount=amount)
+        results = question_service.search_questions(topic=topic, amount=amount)
         return results
 
     except Exception as e:
@@ -79,17 +107,37 @@ def search_questions_endpoint(
         )
 
 @app.post("/questions", tags=["Questions"], status_code=status.HTTP_201_CREATED)
-def add_new_question_endpoint(
+async def add_new_question_endpoint(
     question_data: QuestionBase,
-    service: QuestionService = Depends(get_question_service)
 ):
     """Insere uma nova questão no banco de dados SQL e no índice vetorial Qdrant."""
     try:
-        service.add_single_question(question_data)
+        await question_service.add_single_question(question_data)
         return {"message": "Questão inserida com sucesso."}
     except Exception as e:
         print(f"ERRO CRÍTICO no POST /questions: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro interno do servidor ao inserir a questão."
-        )
\ No newline at end of file
+        )
+
+@app.post("/questions/bulk", tags=["Questions"], status_code=status.HTTP_201_CREATED)
+async def add_new_questions_bulk_endpoint(
+    questions_data: List[QuestionBase],
+):
+    """Insere várias questões de uma vez: embeddings gerados em lote, uma transação SQL e um upload em lotes no Qdrant."""
+    if not questions_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A lista de questões não pode ser vazia."
+        )
+
+    try:
+        total_added = await question_service.add_questions_batch(questions_data)
+        return {"message": f"{total_added} questões inseridas com sucesso."}
+    except Exception as e:
+        print(f"ERRO CRÍTICO no POST /questions/bulk: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor ao inserir as questões."
+        )
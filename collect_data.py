@@ -1,9 +1,11 @@
 # collect_data.py (Versão Final com Filtro de Imagem e Balanceamento de Tópicos)
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import os
 import re # Necessário para a limpeza de texto
+from collections import Counter
 from tqdm import tqdm
 from typing import List, Dict, Any, Optional
 
@@ -15,6 +17,10 @@ OUTPUT_FILE = "data/initial_enem_data.json"
 YEARS_TO_COLLECT = [2022, 2021, 2020, 2019, 2018] 
 TOTAL_QUESTION_TARGET = 100 
 LIMIT_PER_REQUEST = 30 
+REQUEST_TIMEOUT = 10 # segundos
+MAX_CONCURRENT_REQUESTS = 8 
+MAX_RETRIES = 5 
+RETRY_STATUS_CODES = {429, 502, 503, 504}
 
 # Tópicos alvo (usando os valores que a API retorna)
 TARGET_TOPICS = [
@@ -26,6 +32,11 @@ TARGET_TOPICS = [
 # Número ideal de questões por tópico (100 / 4 = 25)
 TARGET_PER_TOPIC = TOTAL_QUESTION_TARGET // len(TARGET_TOPICS) 
 
+# Padrões de limpeza pré-compilados (uma única passada sobre o texto):
+# imagens Markdown (ex: ![](URL)), URLs standalone e referências de rodapé
+# (ex: Disponível em: www.site.com. Acesso em: data.)
+_NOISE_RE = re.compile(r'!\[.*?\]\(.*?\)|https?://\S+|Disponível em:.*Acesso em:.*')
+
 
 # ----------------------------------------------------
 # FUNÇÃO DE LIMPEZA DE TEXTO
@@ -37,159 +48,186 @@ def clean_statement_text(text: str) -> str:
     if not isinstance(text, str):
         return ""
     
-    # 1. Remove links de imagem Markdown (ex: ![](URL))
-    text = re.sub(r'!\[.*?\]\((.*?)\)', '', text)
-    
-    # 2. Remove URLs standalone (http:// ou https://)
-    text = re.sub(r'https?://\S+', '', text)
+    # 1. Remove links de imagem Markdown, URLs e referências de rodapé
+    text = _NOISE_RE.sub('', text)
     
-    # 3. Remove referências de rodapé comuns após a imagem
-    # (ex: Disponível em: www.site.com. Acesso em: data.)
-    text = re.sub(r'Disponível em:.*Acesso em:.*', '', text)
-    
-    # 4. Remove quebras de linha múltiplas e espaços extras
-    text = text.replace('\n', ' ').strip()
-    text = re.sub(r'\s+', ' ', text).strip()
+    # 2. Remove quebras de linha múltiplas e espaços extras (split/join é mais rápido que regex)
+    text = ' '.join(text.split())
     
     return text
 
 
 # ----------------------------------------------------
-# FUNÇÃO DE COLETA PAGINADA
+# FUNÇÕES DE REQUISIÇÃO (ASSÍNCRONAS)
 # ----------------------------------------------------
 
-def collect_questions_for_year(year: int, all_formatted_questions: List[Dict[str, Any]]):
-    """Coleta questões de um ano, tentando balancear os tópicos."""
+async def fetch_page(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, year: int, offset: int) -> Optional[Dict[str, Any]]:
+    """Busca uma página de questões de um ano. Retorna None se a requisição falhar."""
     
     questions_endpoint = f"{API_BASE_URL}/exams/{year}/questions"
-    offset = 0
-    total_expected = 1
+    params = {
+        "limit": LIMIT_PER_REQUEST,
+        "offset": offset,
+    }
+
+    async with semaphore:
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = await client.get(questions_endpoint, params=params)
+                if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                    continue
+                response.raise_for_status()
+                return orjson.loads(response.content)
+                
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                print(f"   Erro na requisição para {year} offset={offset}: {e}.")
+                return None
+
+    return None
+
+
+async def fetch_all_pages(years: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Baixa em paralelo todas as páginas dos anos informados.
+    Primeiro busca a página 0 de cada ano (para ler 'metadata.total') e, em seguida,
+    dispara todas as páginas restantes de uma vez, limitadas por MAX_CONCURRENT_REQUESTS.
+    Retorna {ano: [questões brutas, na ordem da API]}.
+    """
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async with httpx.AsyncClient(http2=True, timeout=REQUEST_TIMEOUT) as client:
+        first_pages = await asyncio.gather(*(fetch_page(client, semaphore, year, 0) for year in years))
+        
+        pairs = []
+        for year, first_page in zip(years, first_pages):
+            if not first_page:
+                continue
+            metadata: Dict[str, Any] = first_page.get('metadata', {})
+            if metadata.get('hasMore', False):
+                total_expected = metadata.get('total', 0)
+                pairs.extend((year, offset) for offset in range(LIMIT_PER_REQUEST, total_expected, LIMIT_PER_REQUEST))
+        
+        other_pages = await asyncio.gather(*(fetch_page(client, semaphore, year, offset) for year, offset in pairs))
+
+    pages_by_year: Dict[int, List[Optional[Dict[str, Any]]]] = {year: [page] for year, page in zip(years, first_pages)}
+    for (year, _), page in zip(pairs, other_pages):
+        pages_by_year[year].append(page)
+
+    items_by_year: Dict[int, List[Dict[str, Any]]] = {}
+    for year, pages in pages_by_year.items():
+        items_by_year[year] = []
+        for page in pages:
+            # Mantém o comportamento sequencial: uma página com erro (ou vazia) encerra o ano
+            if not page or not page.get('questions'):
+                break
+            items_by_year[year].extend(page['questions'])
+            
+    return items_by_year
+
+
+# ----------------------------------------------------
+# FUNÇÃO DE PROCESSAMENTO POR ANO
+# ----------------------------------------------------
+
+def collect_questions_for_year(year: int, data_list: List[Dict[str, Any]], all_formatted_questions: List[Dict[str, Any]]):
+    """Processa as questões de um ano (já baixadas), tentando balancear os tópicos."""
     
     # Contador para monitorar o que já foi coletado
-    current_topic_counts = {topic: 0 for topic in TARGET_TOPICS}
-    for q in all_formatted_questions:
-        if q['topic'] in current_topic_counts:
-            current_topic_counts[q['topic']] += 1
+    current_topic_counts = Counter({topic: 0 for topic in TARGET_TOPICS})
+    current_topic_counts.update(q['topic'] for q in all_formatted_questions if q['topic'] in current_topic_counts)
 
-    print(f"\n-> Iniciando coleta paginada para o ENEM {year}. Status inicial: {current_topic_counts}")
+    print(f"\n-> Processando questões do ENEM {year}. Status inicial: {dict(current_topic_counts)}")
+    
+    # Aliases locais: evitam a busca de atributo a cada iteração do loop
+    append_question = all_formatted_questions.append
     
-    while True:
+    # Processamento do lote
+    for item in tqdm(data_list, desc=f"Processando {year} (Total: {len(data_list)}, Coletados: {len(all_formatted_questions)})"):
         if len(all_formatted_questions) >= TOTAL_QUESTION_TARGET:
             break
-            
-        limit = min(LIMIT_PER_REQUEST, TOTAL_QUESTION_TARGET - len(all_formatted_questions))
         
-        params = {
-            "limit": limit,
-            "offset": offset,
-        }
+        item_topic = item.get('discipline')
+        
+        # Lógica de Balanceamento: Pula se já atingiu o limite para o tópico
+        if item_topic in current_topic_counts and current_topic_counts[item_topic] >= TARGET_PER_TOPIC:
+            continue
 
         try:
-            response = requests.get(questions_endpoint, params=params)
-            response.raise_for_status() 
-            raw_data = response.json()
+            correct_letter: Optional[str] = item.get('correctAlternative')
+            alternatives_texts = []
+            options = item.get('alternatives', [])
             
-        except requests.exceptions.RequestException as e:
-            print(f"   Erro na requisição para offset={offset}: {e}. Parando ano {year}.")
-            break
+            if len(options) != 5 or not correct_letter:
+                continue
 
-        data_list: List[Dict[str, Any]] = raw_data.get('questions', [])
-        metadata: Dict[str, Any] = raw_data.get('metadata', {})
-        
-        total_expected = metadata.get('total', 0)
-        has_more = metadata.get('hasMore', False)
-        
-        if not data_list:
-            break 
+            for opt in options:
+                alternatives_texts.append(opt['text'])
             
-        # Processamento do lote
-        for item in tqdm(data_list, desc=f"Processando {year} (Total: {total_expected}, Coletados: {len(all_formatted_questions)})"):
-            if len(all_formatted_questions) >= TOTAL_QUESTION_TARGET:
-                break
+            # ⬇️ APLICAÇÃO DO FILTRO DE LIMPEZA
             
-            item_topic = item.get('discipline')
+            # 1. Tenta pegar o enunciado da forma mais provável
+            raw_statement = item.get('statement') or item.get('text') or item.get('context', 'Sem enunciado')
             
-            # Lógica de Balanceamento: Pula se já atingiu o limite para o tópico
-            if item_topic in current_topic_counts and current_topic_counts[item_topic] >= TARGET_PER_TOPIC:
-                continue
-
-            try:
-                correct_letter: Optional[str] = item.get('correctAlternative')
-                alternatives_texts = []
-                options = item.get('alternatives', [])
-                
-                if len(options) != 5 or not correct_letter:
-                    continue
-
-                for opt in options:
-                    alternatives_texts.append(opt['text'])
-                
-                # ⬇️ APLICAÇÃO DO FILTRO DE LIMPEZA
-                
-                # 1. Tenta pegar o enunciado da forma mais provável
-                raw_statement = item.get('statement') or item.get('text') or item.get('context', 'Sem enunciado')
-                
-                # 2. Limpa o texto de qualquer link/referência
-                final_statement = clean_statement_text(raw_statement)
-                
-                # 3. Filtro de Qualidade: Descartar se o texto limpo for muito curto
-                if len(final_statement) < 30: # 30 caracteres é um bom mínimo para um enunciado
-                    # print(f"AVISO: Questão do ano {year} descartada por enunciado muito curto/vazio após limpeza.")
-                    continue 
-
-                # ----------------------------------------------------
-                
-                all_formatted_questions.append({
-                    "statement": final_statement, 
-                    "alternatives": alternatives_texts,
-                    "correct_answer": correct_letter,
-                    "topic": item_topic, 
-                    "year": year
-                })
-                
-                # Atualiza a contagem após a coleta bem-sucedida
-                if item_topic in current_topic_counts:
-                    current_topic_counts[item_topic] += 1
-                
-            except Exception:
-                continue
+            # 2. Limpa o texto de qualquer link/referência
+            final_statement = clean_statement_text(raw_statement)
+            
+            # 3. Filtro de Qualidade: Descartar se o texto limpo for muito curto
+            if len(final_statement) < 30: # 30 caracteres é um bom mínimo para um enunciado
+                # print(f"AVISO: Questão do ano {year} descartada por enunciado muito curto/vazio após limpeza.")
+                continue 
 
-        # Lógica de Paginação
-        if not has_more or offset + limit >= total_expected:
-            break
-        
-        offset += limit
+            # ----------------------------------------------------
+            
+            append_question({
+                "statement": final_statement, 
+                "alternatives": alternatives_texts,
+                "correct_answer": correct_letter,
+                "topic": item_topic, 
+                "year": year
+            })
+            
+            # Atualiza a contagem após a coleta bem-sucedida
+            if item_topic in current_topic_counts:
+                current_topic_counts[item_topic] += 1
+            
+        except Exception:
+            continue
         
-    print(f"   Finalizado {year}. Status atual: {current_topic_counts}")
+    print(f"   Finalizado {year}. Status atual: {dict(current_topic_counts)}")
     return all_formatted_questions
 
 # ----------------------------------------------------
 # FUNÇÃO PRINCIPAL
 # ----------------------------------------------------
 
-def collect_enem_questions():
+async def collect_enem_questions():
     all_formatted_questions: List[Dict[str, Any]] = []
 
+    # Todas as páginas de todos os anos são baixadas em paralelo...
+    print(f"-> Baixando questões dos anos {YEARS_TO_COLLECT} (até {MAX_CONCURRENT_REQUESTS} requisições simultâneas)")
+    items_by_year = await fetch_all_pages(YEARS_TO_COLLECT)
+
+    # ...e processadas na ordem original dos anos, preservando o balanceamento
     for year in YEARS_TO_COLLECT:
         if len(all_formatted_questions) >= TOTAL_QUESTION_TARGET:
             break
         
-        collect_questions_for_year(year, all_formatted_questions)
+        collect_questions_for_year(year, items_by_year.get(year, []), all_formatted_questions)
 
     # --- Salvamento Final ---
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
     
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_formatted_questions, f, ensure_ascii=False, indent=2)
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(orjson.dumps(all_formatted_questions, option=orjson.OPT_INDENT_2))
         
     print(f"\n--- Coleta Finalizada! {len(all_formatted_questions)} questões salvas em {OUTPUT_FILE} ---")
     
-    final_counts = {}
-    for q in all_formatted_questions:
-        final_counts[q['topic']] = final_counts.get(q['topic'], 0) + 1
+    final_counts = Counter(q['topic'] for q in all_formatted_questions)
     
-    print(f"Distribuição de Tópicos (Meta: {TARGET_PER_TOPIC} por tópico): {final_counts}")
+    print(f"Distribuição de Tópicos (Meta: {TARGET_PER_TOPIC} por tópico): {dict(final_counts)}")
 
 
 if __name__ == "__main__":
-    collect_enem_questions()
\ No newline at end of file
+    asyncio.run(collect_enem_questions())
@@ -1,10 +1,27 @@
 # core/embedding_model.py
-from typing import List
+from typing import Dict, List, Tuple
+from functools import lru_cache
+import asyncio
 import os
+import numpy as np
 from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings 
 
+from .genai_client import CLIENT
+
 EMBEDDING_MODEL = 'models/text-embedding-004' 
 EMBEDDING_SIZE = 768 
+# Tamanho de cada micro-lote enviado à API de embeddings em chamadas em massa
+EMBED_BATCH_SIZE = 64
+# Máximo de requisições de embedding simultâneas nos caminhos assíncronos
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "16"))
+# Quantidade de textos distintos cujo embedding fica memorizado (cache exato por texto)
+EMBED_CACHE_SIZE = 8192
+
+def _normalize(vector: List[float]) -> np.ndarray:
+    """Normaliza o vetor para norma 1: no índice, o produto interno passa a ser a similaridade de cosseno."""
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm > 0 else v
 
 class EmbeddingModel:
     """Responsável por gerar vetores (embeddings) a partir de texto usando LangChain/Gemini."""
@@ -19,19 +36,106 @@ class EmbeddingModel:
         self.embed_function = GoogleGenerativeAIEmbeddings(
             model=EMBEDDING_MODEL,
         )
+        # Reaproveita o cliente GenAI compartilhado (mesmo pool de conexões do gerador de questões)
+        self.embed_function.client = CLIENT
+        # Limite compartilhado por todas as chamadas assíncronas (carga inicial e inserções concorrentes)
+        self._embed_semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+
+        # Cache exato (texto -> vetor): textos repetidos não geram nova chamada à API
+        self._embed_query_cached = lru_cache(maxsize=EMBED_CACHE_SIZE)(self._embed_query)
 
-    def generate_embedding(self, text: str) -> List[float]:
-        """Gera um embedding (vetor) para um dado texto."""
+    def _embed_query(self, text: str) -> np.ndarray:
+        # Somente leitura, para que o valor em cache não seja alterado por quem o recebe
+        vector = _normalize(self.embed_function.embed_query(text))
+        vector.flags.writeable = False
+        return vector
+
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """Gera o embedding (vetor float32) de uma query de busca (task_type RETRIEVAL_QUERY)."""
         if not text:
-            return [0.0] * EMBEDDING_SIZE
+            return np.zeros(EMBEDDING_SIZE, dtype=np.float32)
             
         try:
-            # Usa o método embed_query
-            embedding_vector = self.embed_function.embed_query(text)
+            # Usa o método embed_query (memorizado por texto)
+            embedding_vector = self._embed_query_cached(text)
             
             return embedding_vector
             
         except Exception as e:
              raise Exception(f"Falha de API no LangChain/Gemini. Verifique sua chave. {type(e).__name__}: {e}")
 
+    @staticmethod
+    def _unique_order(texts: List[str]) -> Tuple[List[int], Dict[str, int]]:
+        """
+        Índices dos textos a enviar à API: apenas a primeira ocorrência de cada texto não vazio,
+        ordenados por tamanho. Retorna também o mapa texto -> índice da primeira ocorrência.
+        """
+        first_index: Dict[str, int] = {}
+        for i, text in enumerate(texts):
+            if text and text not in first_index:
+                first_index[text] = i
+        order = sorted(first_index.values(), key=lambda i: len(texts[i]))
+        return order, first_index
+
+    @staticmethod
+    def _fill_duplicates(texts: List[str], embeddings: np.ndarray, first_index: Dict[str, int]) -> np.ndarray:
+        """Copia o vetor da primeira ocorrência para os textos repetidos."""
+        if len(first_index) < len(texts):
+            for i, text in enumerate(texts):
+                if text and first_index[text] != i:
+                    embeddings[i] = embeddings[first_index[text]]
+        return embeddings
+
+    def generate_embeddings(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+        """
+        Gera embeddings para uma lista de textos em micro-lotes (uma requisição por lote), como matriz float32 [N, dim].
+        Usado para indexar questões (task_type RETRIEVAL_DOCUMENT).
+        Os textos são ordenados por tamanho antes do fatiamento; a ordem original é preservada no retorno.
+        Textos repetidos são enviados uma única vez.
+        """
+        embeddings = np.zeros((len(texts), EMBEDDING_SIZE), dtype=np.float32)
+        order, first_index = self._unique_order(texts)
+
+        try:
+            for start in range(0, len(order), batch_size):
+                chunk = order[start:start + batch_size]
+                vectors = self.embed_function.embed_documents(
+                    [texts[i] for i in chunk],
+                    batch_size=batch_size
+                )
+                for i, vector in zip(chunk, vectors):
+                    embeddings[i] = _normalize(vector)
+
+            return self._fill_duplicates(texts, embeddings, first_index)
+
+        except Exception as e:
+             raise Exception(f"Falha de API no LangChain/Gemini. Verifique sua chave. {type(e).__name__}: {e}")
+
+    async def generate_embeddings_async(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+        """
+        Versão assíncrona de generate_embeddings: os micro-lotes são enviados em paralelo
+        (asyncio.gather), limitados a EMBED_MAX_CONCURRENCY requisições simultâneas no processo inteiro.
+        """
+        embeddings = np.zeros((len(texts), EMBEDDING_SIZE), dtype=np.float32)
+        order, first_index = self._unique_order(texts)
+
+        async def embed_chunk(chunk: List[int]):
+            async with self._embed_semaphore:
+                vectors = await self.embed_function.aembed_documents(
+                    [texts[i] for i in chunk],
+                    batch_size=batch_size
+                )
+            for i, vector in zip(chunk, vectors):
+                embeddings[i] = _normalize(vector)
+
+        try:
+            await asyncio.gather(*(
+                embed_chunk(order[start:start + batch_size])
+                for start in range(0, len(order), batch_size)
+            ))
+            return self._fill_duplicates(texts, embeddings, first_index)
+
+        except Exception as e:
+             raise Exception(f"Falha de API no LangChain/Gemini. Verifique sua chave. {type(e).__name__}: {e}")
+
 embedding_model = EmbeddingModel()
\ No newline at end of file
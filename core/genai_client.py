@@ -0,0 +1,10 @@
+# core/genai_client.py
+from google import genai
+
+# Cliente GenAI único, compartilhado pelo gerador de questões e pelo modelo de embeddings:
+# um só pool de conexões HTTP (keep-alive/TLS reaproveitados entre as chamadas).
+try:
+    CLIENT = genai.Client()
+except Exception as e:
+    print(f"ERRO: Cliente GenAI não pôde ser inicializado. Verifique GEMINI_API_KEY. {e}")
+    raise
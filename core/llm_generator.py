@@ -1,46 +1,62 @@
 # core/llm_generator.py
-import json
+import asyncio
+import hashlib
 from typing import List, Optional
+from cachetools import TTLCache
+from pydantic import TypeAdapter, ValidationError
 from google import genai
 from google.genai.errors import APIError
-from api.models import QuestionIn, QuestionInternal
+from api.models import QuestionInternal
+from .genai_client import CLIENT
 
 GENERATION_MODEL = 'gemini-2.5-flash' 
+# Quantos enunciados existentes entram no prompt
+MAX_EXISTING_STATEMENTS = 5
+# Questões pedidas por chamada ao Gemini e máximo de chamadas simultâneas (limite de rate)
+QUESTIONS_PER_CALL = 3
+MAX_CONCURRENT_GENERATIONS = 4
+
+QUESTION_JSON_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "statement": {"type": "string", "description": "O enunciado longo e contextualizado."},
+            "alternatives": {"type": "array", "items": {"type": "string"}, "description": "Lista de 5 opções."},
+            "correct_answer": {"type": "string", "enum": ["A", "B", "C", "D", "E"], "description": "A letra da resposta correta."},
+        },
+        "required": ["statement", "alternatives", "correct_answer"],
+    },
+}
+
+SYSTEM_INSTRUCTION = (
+    "Você é um especialista em elaboração de itens para o Exame Nacional do Ensino Médio (ENEM). "
+    "Sua tarefa é gerar APENAS uma lista de objetos JSON. "
+    "As questões devem ter: "
+    "1. Enunciado longo, contextualizado e interdisciplinar. "
+    "2. Cinco alternativas (A, B, C, D, E). "
+    "3. A alternativa correta deve ser indicada no campo 'correct_answer'."
+)
+
+# Decodifica e valida a resposta JSON do Gemini de uma vez (pydantic-core, sem dicts intermediários)
+GENERATED_QUESTIONS_ADAPTER = TypeAdapter(List[QuestionInternal])
 
 class LLMQuestionGenerator:
     """Responsável por gerar novas questões ENEM no formato JSON."""
     
     def __init__(self):
-        try:
-            self.client = genai.Client()
-        except Exception as e:
-            print(f"ERRO: Cliente GenAI não pôde ser inicializado. Verifique GEMINI_API_KEY. {e}")
-            raise
-
-    def generate_questions(self, topic: str, count: int, existing_statements: List[str] = None) -> List[QuestionInternal]:
-        """Gera 'count' novas questões ENEM sobre o 'topic', evitando 'existing_statements'."""
+        self.client = CLIENT
         
-        json_schema = {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "statement": {"type": "string", "description": "O enunciado longo e contextualizado."},
-                    "alternatives": {"type": "array", "items": {"type": "string"}, "description": "Lista de 5 opções."},
-                    "correct_answer": {"type": "string", "enum": ["A", "B", "C", "D", "E"], "description": "A letra da resposta correta."},
-                },
-                "required": ["statement", "alternatives", "correct_answer"],
-            },
-        }
+        # Cache das gerações por (tópico, quantidade, enunciados a evitar)
+        self._cache = TTLCache(maxsize=256, ttl=3600)
 
-        system_instruction = (
-            "Você é um especialista em elaboração de itens para o Exame Nacional do Ensino Médio (ENEM). "
-            "Sua tarefa é gerar APENAS uma lista de objetos JSON. "
-            "As questões devem ter: "
-            "1. Enunciado longo, contextualizado e interdisciplinar. "
-            "2. Cinco alternativas (A, B, C, D, E). "
-            "3. A alternativa correta deve ser indicada no campo 'correct_answer'."
-        )
+    @staticmethod
+    def _cache_key(topic: str, count: int, existing_statements: List[str]) -> str:
+        raw = f"{topic}|{count}|" + "\n".join(sorted(existing_statements))
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    async def _generate_chunk(self, semaphore: asyncio.Semaphore, topic: str, count: int, existing_statements: List[str]) -> List[QuestionInternal]:
+        """Uma chamada ao Gemini pedindo 'count' questões (executada em paralelo com as demais)."""
 
         user_prompt = (
             f"Gere exatamente {count} questões no estilo ENEM sobre o seguinte tópico: **{topic}**. "
@@ -49,37 +65,69 @@ class LLMQuestionGenerator:
         
         if existing_statements:
             user_prompt += "Mantenha a originalidade; não gere questões que sejam semanticamente iguais aos seguintes enunciados:\n"
-            user_prompt += "\n---\n".join(existing_statements[:5])
+            user_prompt += "\n---\n".join(existing_statements)
             
         try:
-            response = self.client.models.generate_content(
-                model=GENERATION_MODEL,
-                contents=user_prompt,
-                config=genai.types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    response_mime_type="application/json",
-                    response_schema=json_schema,
-                    temperature=0.7
-                ),
-            )
-            
-            generated_data = json.loads(response.text)
-            
-            questions = []
-            for item in generated_data:
-                q_in = QuestionIn(**item, topic=topic)
-                questions.append(QuestionInternal(
-                    statement=q_in.statement,
-                    alternatives=q_in.alternatives,
-                    correct_answer=q_in.correct_answer,
-                    topic=topic,
-                    source="GENERATED"
-                ))
+            async with semaphore:
+                response = await self.client.aio.models.generate_content(
+                    model=GENERATION_MODEL,
+                    contents=user_prompt,
+                    config=genai.types.GenerateContentConfig(
+                        system_instruction=SYSTEM_INSTRUCTION,
+                        response_mime_type="application/json",
+                        response_schema=QUESTION_JSON_SCHEMA,
+                        temperature=0.7
+                    ),
+                )
             
+            # 'source' já tem GENERATED como padrão; o tópico vem do pedido, não da resposta
+            questions = GENERATED_QUESTIONS_ADAPTER.validate_json(response.text)
+            for question in questions:
+                question.topic = topic
             return questions
 
-        except (APIError, json.JSONDecodeError, KeyError) as e:
+        except (APIError, ValidationError, KeyError) as e:
             print(f"Erro na geração do LLM ou parsing: {e}")
             return []
 
+    async def generate_questions(self, topic: str, count: int, existing_statements: List[str] = None) -> List[QuestionInternal]:
+        """
+        Gera 'count' novas questões ENEM sobre o 'topic', evitando 'existing_statements'.
+        O pedido é dividido em chamadas de até QUESTIONS_PER_CALL questões, feitas em paralelo:
+        a latência passa a ser a da chamada mais lenta, e não a da geração de todas as questões em sequência.
+        """
+        
+        existing_statements = (existing_statements or [])[:MAX_EXISTING_STATEMENTS]
+        
+        cache_key = self._cache_key(topic, count, existing_statements)
+        cached_questions = self._cache.get(cache_key)
+        if cached_questions is not None:
+            return [question.model_copy() for question in cached_questions]
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+        results = await asyncio.gather(
+            *(
+                self._generate_chunk(semaphore, topic, min(QUESTIONS_PER_CALL, count - start), existing_statements)
+                for start in range(0, count, QUESTIONS_PER_CALL)
+            ),
+            return_exceptions=True
+        )
+        
+        # Junta os resultados das chamadas, descartando falhas e enunciados repetidos
+        questions = []
+        seen_statements = set()
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Erro na geração do LLM ou parsing: {type(result).__name__}: {result}")
+                continue
+            for question in result:
+                if question.statement in seen_statements:
+                    continue
+                seen_statements.add(question.statement)
+                questions.append(question)
+        
+        if questions:
+            self._cache[cache_key] = questions
+        return [question.model_copy() for question in questions]
+
 llm_generator = LLMQuestionGenerator()
\ No newline at end of file
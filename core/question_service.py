@@ -1,64 +1,270 @@
 # core/question_service.py
 
-import json
+import asyncio
+import mmap
+import operator
 import os 
-from typing import List, Dict, Any, Optional
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Optional, BinaryIO, Callable, Iterator, Tuple, Union
+
+import ijson
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from sqlalchemy import delete, insert
 
 # Se você migrar para LangChain, substitua as importações Qdrant e embedding_model
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client.models import (
+    Distance, VectorParams, Filter, FieldCondition, MatchValue,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams, QuantizationSearchParams,
+    HnswConfigDiff, OptimizersConfigDiff, PayloadSchemaType, PointIdsList
+)
 
 # Importações de dependências
 from .embedding_model import embedding_model
+from .semantic_cache import SemanticCache
 from db.sql_db import SessionLocal, Base, engine 
-from db.schemas import QuestionModel, QuestionTopic, QuestionBase 
+from db.schemas import QuestionModel, QuestionTopic, QuestionBase, QuestionInsert 
+
+# Coleção do Qdrant com os vetores das questões
+COLLECTION_NAME = "enem_questions"
+# Registro da carga inicial (JSON lines): IDs de cada bloco gravado e, ao final, a marca de conclusão
+DEFAULT_LOAD_MARKER_PATH = os.path.join("./qdrant_storage", "initial_load.jsonl")
+
+# Tabelas SQL já criadas neste processo (ver QuestionService._init_sql_db)
+_SQL_INITIALIZED = False
+
+# Pontos enviados por requisição ao Qdrant nas inserções em massa
+UPLOAD_BATCH_SIZE = 512
+# Questões por bloco da carga inicial (embeddings do bloco seguinte são gerados durante a persistência do anterior)
+LOAD_CHUNK_SIZE = 512
+# IDs por comando ao desfazer uma carga inicial incompleta (abaixo do limite de parâmetros do SQLite)
+DELETE_BATCH_SIZE = 500
+
+# Áreas do ENEM: uma busca com um desses valores exatos vira filtro estrutural
+TARGET_TOPICS = ["linguagens", "ciencias-natureza", "ciencias-humanas", "matematica"]
+
+# Campos do payload do Qdrant e os nomes correspondentes no resultado da busca (QuestionTopic)
+_PAYLOAD_FIELDS = operator.itemgetter("id", "statement", "topic", "alternatives", "correct_answer")
+_RESULT_FIELDS = ("id", "text", "area", "alternatives", "correct_answer", "score")
+
+@dataclass(slots=True)
+class _LoadChunk:
+    """Bloco da carga inicial: questões válidas e as strings de contexto correspondentes (mesma ordem)."""
+    items: List[QuestionInsert] = field(default_factory=list)
+    contexts: List[str] = field(default_factory=list)
 
 class QuestionService:
     """
     Serviço centralizado que gerencia a inicialização do DB, Qdrant e a lógica de busca/persisitência.
     """
     
-    def __init__(self, qdrant_client: QdrantClient):
+    # Parâmetros do índice HNSW (grafo: m, ef_construct; busca: ef_search)
+    HNSW_M = 24
+    HNSW_EF_CONSTRUCT = 128
+    HNSW_EF_SEARCH = 100
+    HNSW_FULL_SCAN_THRESHOLD = 10000
+    # Limiar de indexação padrão do Qdrant, restaurado após a carga em massa
+    INDEXING_THRESHOLD = 20000
+    # Quantização escalar int8 (quantil usado na calibração e sobreamostragem do rescore em float32)
+    QUANTIZATION_QUANTILE = 0.99
+    QUANTIZATION_OVERSAMPLING = 2.0
+    
+    def __init__(self, qdrant_client: QdrantClient, load_marker_path: str = DEFAULT_LOAD_MARKER_PATH):
         self.qdrant_client = qdrant_client
-        self.collection_name = "enem_questions"
+        self.collection_name = COLLECTION_NAME
+        # Arquivo que registra o progresso da carga inicial (fica junto do índice do Qdrant)
+        self.load_marker_path = load_marker_path
+        # Cache semântico das buscas (evita nova busca no Qdrant para queries quase idênticas)
+        self.search_cache = SemanticCache()
+        # Cache exato das buscas por (topic, amount), consultado antes de gerar o embedding da query
+        self.results_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._results_cache_lock = threading.Lock()
+        # Incrementada a cada invalidação: uma busca iniciada antes dela não grava seu resultado nos caches
+        self._cache_generation = 0
         
-        # Sequência de Inicialização Forçada
-        Base.metadata.create_all(bind=engine)
+        # Fica True quando a carga inicial (indexação) termina sem erros
+        self.is_ready = False
         
+        # Sequência de Inicialização Forçada (a carga de dados é feita à parte, em load_initial_data)
+        self._init_sql_db()
         self._init_qdrant_collection()
-        self._check_and_load_data()
+
+    def _init_sql_db(self):
+        """Cria as tabelas SQL uma única vez por processo (novas instâncias do serviço não repetem a reflexão)."""
+        global _SQL_INITIALIZED
+        if _SQL_INITIALIZED:
+            return
+        Base.metadata.create_all(bind=engine)
+        _SQL_INITIALIZED = True
 
     def _init_qdrant_collection(self):
         """Inicializa a coleção no Qdrant se ela não existir."""
         try:
-            collections = self.qdrant_client.get_collections().collections
-            if self.collection_name not in [c.name for c in collections]:
-                print(f"Creating Qdrant In-Memory collection: {self.collection_name}")
-                self.qdrant_client.recreate_collection(
+            if not self.qdrant_client.collection_exists(self.collection_name):
+                print(f"Creating Qdrant collection: {self.collection_name}")
+                self.qdrant_client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
                         size=embedding_model.EMBEDDING_SIZE, 
-                        distance=Distance.COSINE
+                        # Embeddings já normalizados (norma 1): produto interno == cosseno, sem recalcular normas
+                        distance=Distance.DOT,
+                        on_disk=False
+                    ),
+                    hnsw_config=HnswConfigDiff(
+                        m=self.HNSW_M,
+                        ef_construct=self.HNSW_EF_CONSTRUCT,
+                        full_scan_threshold=self.HNSW_FULL_SCAN_THRESHOLD
+                    ),
+                    # Quantização escalar int8: vetores ocupam 1/4 da RAM e a distância é calculada em int8
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8,
+                            quantile=self.QUANTIZATION_QUANTILE,
+                            always_ram=True
+                        )
                     ),
                 )
+                # Índice invertido no campo usado pela Filtragem Estrutural (evita varrer todos os payloads)
+                self.qdrant_client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name="topic",
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
         except Exception as e:
             print(f"Error initializing Qdrant collection: {e}")
             raise
 
-    def _check_and_load_data(self):
-        """Verifica se há dados no Qdrant e dispara a carga se necessário."""
-        
+    async def load_initial_data(self):
+        """
+        Verifica o registro da carga inicial e dispara a carga se necessário.
+        Pensado para rodar em background (lifespan da API); só marca o serviço como pronto
+        se a carga terminar sem erros (uma falha deixa o readiness em 503 e a próxima inicialização tenta de novo).
+        """
+        loaded = False
         try:
-            count_result = self.qdrant_client.count(collection_name=self.collection_name, exact=True)
-            if count_result.count == 0:
-                print("--- Iniciando Carga de Dados Iniciais (Indexação) ---")
-                self._load_initial_data() 
+            load_marker = self._read_load_marker()
+            if load_marker is None and self._has_points():
+                # Índice criado antes do registro existir: a carga é considerada concluída
+                print("--- Qdrant já contém questões. Pulando carga inicial. ---")
+                self._mark_initial_load_complete()
+                loaded = True
+            elif load_marker is not None and load_marker[0]:
+                print("--- Carga inicial já concluída. Pulando carga inicial. ---")
+                loaded = True
             else:
-                print(f"--- Qdrant já contém {count_result.count} questões. Pulando carga inicial. ---")
+                if load_marker is not None:
+                    self._discard_partial_load(load_marker[1])
+                print("--- Iniciando Carga de Dados Iniciais (Indexação) ---")
+                self._start_load_marker()
+                loaded = await self._load_initial_data()
+                if loaded:
+                    self._mark_initial_load_complete()
 
         except Exception as e:
-            print(f"Erro ao verificar contagem inicial no Qdrant: {e}")
-            pass
+            print(f"Erro ao verificar a carga inicial no Qdrant: {e}")
+        
+        finally:
+            # Buscas feitas durante a indexação podem ter guardado resultados parciais
+            self._invalidate_search_caches()
+            self.is_ready = loaded
+        
+        if not loaded:
+            print("--- Carga inicial incompleta: serviço não será marcado como pronto. ---")
+            return
+        
+        # Já pronto para atender: o pré-aquecimento só adianta as primeiras buscas por área
+        try:
+            await self._prewarm_query_embeddings()
+        except Exception as e:
+            print(f"Aviso: falha ao pré-aquecer os embeddings das áreas: {e}")
+
+    def _has_points(self) -> bool:
+        """Basta saber se existe algum ponto: scroll(limit=1) evita a contagem exata de todos os segmentos."""
+        points, _ = self.qdrant_client.scroll(
+            collection_name=self.collection_name,
+            limit=1,
+            with_payload=False,
+            with_vectors=False
+        )
+        return bool(points)
+
+    def _read_load_marker(self) -> Optional[Tuple[bool, List[int]]]:
+        """
+        Lê o registro da carga inicial: (concluída, IDs gravados pela carga).
+        Retorna None se a carga nunca foi iniciada com o registro.
+        """
+        if not os.path.exists(self.load_marker_path):
+            return None
+        
+        complete = False
+        question_ids: List[int] = []
+        with open(self.load_marker_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Linha incompleta (processo interrompido no meio da escrita)
+                    continue
+                question_ids.extend(entry.get("ids", []))
+                complete = complete or entry.get("complete", False)
+        return complete, question_ids
+
+    def _append_load_marker(self, entry: dict):
+        """Acrescenta uma linha ao registro, já em disco ao retornar (sobrevive a uma queda do processo)."""
+        with open(self.load_marker_path, 'ab') as f:
+            f.write(orjson.dumps(entry) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _start_load_marker(self):
+        """Cria (ou zera) o registro antes de uma nova carga inicial."""
+        os.makedirs(os.path.dirname(self.load_marker_path) or ".", exist_ok=True)
+        open(self.load_marker_path, 'wb').close()
+
+    def _record_loaded_ids(self, question_ids: List[int]):
+        """Registra os IDs de um bloco assim que ele é gravado no SQL (antes do upload no Qdrant)."""
+        self._append_load_marker({"ids": question_ids})
+
+    def _mark_initial_load_complete(self):
+        """Marca a carga inicial como concluída: as próximas inicializações pulam a carga."""
+        self._append_load_marker({"complete": True})
+
+    def _discard_partial_load(self, question_ids: List[int]):
+        """
+        Desfaz uma carga inicial interrompida: remove do SQL e do Qdrant apenas as questões gravadas por ela,
+        para a nova carga não duplicar questões (inserções feitas pela API nesse meio-tempo são mantidas).
+        """
+        print(f"--- Carga inicial anterior incompleta. Removendo {len(question_ids)} questões gravadas por ela. ---")
+        for start in range(0, len(question_ids), DELETE_BATCH_SIZE):
+            batch = question_ids[start:start + DELETE_BATCH_SIZE]
+            self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=batch),
+                wait=True
+            )
+            with SessionLocal() as db:
+                db.execute(delete(QuestionModel).where(QuestionModel.id.in_(batch)))
+                db.commit()
+
+    @staticmethod
+    def _normalize_topic(topic: str) -> str:
+        """Forma canônica do tópico da busca: sem acentos, caixa e espaços extras."""
+        decomposed = unicodedata.normalize("NFKD", topic)
+        without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+        return " ".join(without_accents.casefold().split())
+
+    def _get_enriched_query(self, topic: str) -> str:
+        """Texto efetivamente vetorizado para uma busca (Enriquecimento da Query)."""
+        return f"Questão do ENEM na área de {topic}"
+
+    async def _prewarm_query_embeddings(self):
+        """Popula o cache LRU de embeddings com as queries das áreas do ENEM (as buscas mais comuns)."""
+        for topic in TARGET_TOPICS:
+            await asyncio.to_thread(embedding_model.generate_embedding, self._get_enriched_query(topic))
 
     def _get_vector_context(self, statement: str, topic: str, alternatives: List[str]) -> str:
         """
@@ -71,58 +277,112 @@ class QuestionService:
             f"Detalhes: {alternatives_text}"
         )
 
-    def _load_initial_data(self): 
+    def _iter_initial_chunks(self, f: Union[BinaryIO, mmap.mmap]) -> Iterator[_LoadChunk]:
         """
-        Lógica de carga inicial, interna ao QuestionService.
+        Lê o JSON inicial item a item (ijson, sem materializar o arquivo inteiro), filtra os itens válidos,
+        monta as strings de contexto e entrega blocos de até LOAD_CHUNK_SIZE questões.
         """
-        CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-        DATA_FILE_PATH = os.path.join(CURRENT_DIR, '..', 'data', 'initial_enem_data.json')
-        
-        if not os.path.exists(DATA_FILE_PATH):
-            print(f"[ERRO DE ARQUIVO] Arquivo não encontrado: {DATA_FILE_PATH}")
-            return
-
-        with open(DATA_FILE_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        total_loaded = 0
-        total_items = len(data)
-        
-        print(f"DEBUG: Iniciando loop de indexação de {total_items} itens.")
-        
-        for i, item in enumerate(data): 
+        chunk = _LoadChunk()
+        for i, item in enumerate(ijson.items(f, 'item', use_float=True)): 
             try:
                 # Filtro de dados para evitar erros de validação (None)
                 if not item.get('statement') or not item.get('topic'):
                     continue
                 alternatives = item.get('alternatives')
-                if not alternatives or any(alt is None for alt in alternatives):
+                if not alternatives or None in alternatives:
                     continue
                 
                 # ⬇️ APLICAÇÃO DO CONTEXT STACKING
-                context_string = self._get_vector_context(
+                chunk.contexts.append(self._get_vector_context(
                     statement=item['statement'],
                     topic=item['topic'],
                     alternatives=alternatives
-                )
-                
-                # Gerar vetor
-                vector = embedding_model.generate_embedding(context_string) 
-                
-                # Persistir
-                self._persist_question_and_vector(
-                    question_data=item, 
-                    vector=vector
-                )
-                
-                total_loaded += 1
+                ))
+                chunk.items.append(item)
                 
             except Exception as e:
-                print(f"\n[ERRO CRÍTICO NO PIPELINE] Falha na indexação do item {i+1}: {type(e).__name__}: {e}. Item descartado.")
+                print(f"\n[ERRO CRÍTICO NO PIPELINE] Falha na preparação do item {i+1}: {type(e).__name__}: {e}. Item descartado.")
                 continue 
+            
+            if len(chunk.items) == LOAD_CHUNK_SIZE:
+                yield chunk
+                chunk = _LoadChunk()
+        
+        if chunk.items:
+            yield chunk
+
+    async def _load_initial_data(self) -> bool: 
+        """
+        Lógica de carga inicial, interna ao QuestionService.
+        Retorna True apenas se todos os blocos foram vetorizados e persistidos.
+        """
+        CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+        DATA_FILE_PATH = os.path.join(CURRENT_DIR, '..', 'data', 'initial_enem_data.json')
+        
+        if not os.path.exists(DATA_FILE_PATH):
+            print(f"[ERRO DE ARQUIVO] Arquivo não encontrado: {DATA_FILE_PATH}")
+            return False
+
+        total_loaded = 0
+        complete = False
+        
+        print("DEBUG: Iniciando loop de indexação (leitura em streaming do JSON).")
+        
+        # 2 e 3. Gerar vetores e persistir cada bloco de LOAD_CHUNK_SIZE, em pipeline:
+        # enquanto os embeddings do bloco seguinte são gerados (event loop), o bloco anterior
+        # é gravado no SQL/Qdrant em uma thread. O HNSW fica desligado durante o upload
+        # e é construído uma única vez sobre o conjunto final.
+        pending_persist: Optional[asyncio.Future] = None
+        try:
+            self._set_indexing_threshold(0)
+            # Arquivo mapeado em memória: o ijson lê direto do page cache, sem cópia para o buffer de leitura
+            with open(DATA_FILE_PATH, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for chunk in self._iter_initial_chunks(mm):
+                    # Uma falha aqui interrompe a carga inteira: a próxima inicialização desfaz os blocos gravados e refaz
+                    vectors = await embedding_model.generate_embeddings_async(chunk.contexts)
+                    
+                    # No máximo um bloco sendo persistido por vez (limita a memória do pipeline).
+                    # shield: um cancelamento não abandona a thread no meio da gravação (ver finally)
+                    if pending_persist is not None:
+                        total_loaded += await asyncio.shield(pending_persist)
+                        pending_persist = None
+                    pending_persist = asyncio.ensure_future(asyncio.to_thread(
+                        self._persist_questions_and_vectors_bulk,
+                        questions_data=chunk.items,
+                        vectors=vectors,
+                        on_sql_commit=self._record_loaded_ids
+                    ))
+            
+            if pending_persist is not None:
+                total_loaded += await asyncio.shield(pending_persist)
+                pending_persist = None
+            complete = True
+            
+        except Exception as e:
+            print(f"\n[ERRO CRÍTICO NO PIPELINE] Falha na indexação em lote: {type(e).__name__}: {e}.")
+        
+        finally:
+            # A thread de gravação não pode ser interrompida: em caso de erro ou cancelamento,
+            # espera o bloco em andamento terminar antes de sair (e de o cliente do Qdrant ser fechado)
+            if pending_persist is not None:
+                await asyncio.wait([pending_persist])
+                if not pending_persist.cancelled() and pending_persist.exception() is None:
+                    total_loaded += pending_persist.result()
+            self._set_indexing_threshold(self.INDEXING_THRESHOLD)
 
         print("\n--- Carga Inicial Finalizada. Total de questões carregadas:", total_loaded, "---")
+        return complete
+
 
+    def _set_indexing_threshold(self, indexing_threshold: int):
+        """Ajusta o limiar de indexação HNSW da coleção (0 desliga a construção do índice)."""
+        try:
+            self.qdrant_client.update_collection(
+                collection_name=self.collection_name,
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+            )
+        except Exception as e:
+            print(f"Aviso: falha ao ajustar o indexing_threshold do Qdrant: {e}")
 
     def get_collection_count(self) -> int:
         """Retorna o número exato de pontos (questões) na coleção Qdrant."""
@@ -136,44 +396,90 @@ class QuestionService:
         except Exception:
             return 0
 
-    def _persist_question_and_vector(self, question_data: dict, vector: List[float]):
-        """Salva a questão no SQL e insere o vetor no Qdrant."""
+    def _persist_question_and_vector(self, question_data: QuestionInsert, vector: np.ndarray):
+        """Salva a questão no SQL e insere o vetor no Qdrant (mesmo caminho da inserção em massa)."""
+        self._persist_questions_and_vectors_bulk(questions_data=[question_data], vectors=vector[np.newaxis])
+
+    def _persist_questions_and_vectors_bulk(
+        self,
+        questions_data: List[QuestionInsert],
+        vectors: np.ndarray,
+        on_sql_commit: Optional[Callable[[List[int]], None]] = None
+    ) -> int:
+        """
+        Salva várias questões no SQL em uma única transação e insere todos os vetores
+        no Qdrant em lotes. Retorna o número de questões persistidas.
+        'on_sql_commit' recebe os IDs gravados logo após o commit no SQL (usado pelo registro da carga inicial).
+        """
+        
+        # 1. Salvar no SQL: INSERT em massa (Core, insertmanyvalues) com RETURNING dos IDs, na ordem das linhas
+        rows = [
+            {
+                "text": question_data['statement'],
+                "area": question_data['topic'],
+                "alternatives": question_data['alternatives'],
+                "correct_answer": question_data['correct_answer'],
+            }
+            for question_data in questions_data
+        ]
         
-        # 1. Salvar no SQL (para obter o ID)
         with SessionLocal() as db:
-            new_question = QuestionModel(
-                text=question_data['statement'],
-                area=question_data['topic'],     
-                alternatives=question_data['alternatives'], 
-                correct_answer=question_data['correct_answer']
+            result = db.execute(
+                insert(QuestionModel).returning(QuestionModel.id, sort_by_parameter_order=True),
+                rows
             )
-            db.add(new_question)
+            question_ids = list(result.scalars())
             db.commit()
-            db.refresh(new_question)
-            question_id = new_question.id
+        
+        if on_sql_commit is not None:
+            on_sql_commit(question_ids)
 
-        # 2. Inserir no Qdrant
-        payload = question_data.copy()
-        payload['id'] = question_id
-        # Garante que as alternativas sejam strings JSON no payload do Qdrant
-        payload['alternatives'] = json.dumps(payload['alternatives']) 
+        # 2. Inserir no Qdrant (upload em lotes de UPLOAD_BATCH_SIZE pontos)
+        payloads = []
+        for question_id, question_data in zip(question_ids, questions_data):
+            payload = question_data.copy()
+            payload['id'] = question_id
+            payloads.append(payload)
         
-        self.qdrant_client.upsert(
+        self.qdrant_client.upload_collection(
             collection_name=self.collection_name,
-            points=[
-                PointStruct(
-                    id=question_id,
-                    vector=vector,
-                    payload=payload
-                )
-            ],
+            vectors=vectors,
+            payload=payloads,
+            ids=question_ids,
+            batch_size=UPLOAD_BATCH_SIZE,
             wait=True
         )
+        return len(question_ids)
 
-    def add_single_question(self, question: QuestionBase):
-        """Gera o embedding e persiste uma única questão no SQL e Qdrant."""
+    async def add_questions_batch(self, questions: List[QuestionBase]) -> int:
+        """Gera os embeddings em lote e persiste várias questões no SQL e Qdrant de uma só vez."""
         
-        question_data = question.dict()
+        questions_data: List[QuestionInsert] = [question.model_dump(exclude_unset=True) for question in questions]
+        
+        # ⬇️ APLICAÇÃO DO CONTEXT STACKING para novas questões
+        contexts = [
+            self._get_vector_context(
+                statement=question_data['statement'],
+                topic=question_data['topic'],
+                alternatives=question_data['alternatives']
+            )
+            for question_data in questions_data
+        ]
+        
+        vectors = await embedding_model.generate_embeddings_async(contexts)
+        # Lote de tamanho arbitrário: a persistência (bloqueante) roda em uma thread, fora do event loop
+        total_added = await asyncio.to_thread(
+            self._persist_questions_and_vectors_bulk,
+            questions_data=questions_data, 
+            vectors=vectors
+        )
+        self._invalidate_search_caches()
+        return total_added
+
+    async def add_single_question(self, question: QuestionBase):
+        """Gera o embedding (sem bloquear o event loop) e persiste uma única questão no SQL e Qdrant."""
+        
+        question_data: QuestionInsert = question.model_dump(exclude_unset=True)
         
         # ⬇️ APLICAÇÃO DO CONTEXT STACKING para novas questões
         context_string = self._get_vector_context(
@@ -182,21 +488,57 @@ class QuestionService:
             alternatives=question_data['alternatives']
         )
         
-        vector = embedding_model.generate_embedding(context_string) 
-        self._persist_question_and_vector(
+        # Mesmo caminho (task_type RETRIEVAL_DOCUMENT) da carga inicial e do POST /questions/bulk:
+        # a mesma questão gera o mesmo vetor, qualquer que seja o endpoint de inserção
+        vector = (await embedding_model.generate_embeddings_async([context_string]))[0]
+        # SQLite e upload no Qdrant são bloqueantes: rodam em uma thread para não travar o event loop
+        await asyncio.to_thread(
+            self._persist_question_and_vector,
             question_data=question_data, 
             vector=vector
         )
+        self._invalidate_search_caches()
 
-    def search_questions(self, topic: str, amount: int = 15) -> List[Dict[str, Any]]:
+    def _invalidate_search_caches(self):
+        """O índice mudou: resultados de buscas anteriores podem estar desatualizados."""
+        with self._results_cache_lock:
+            self._cache_generation += 1
+            self.search_cache.clear()
+            self.results_cache.clear()
+
+    def _cache_search_results(
+        self,
+        generation: int,
+        cache_key: Tuple[str, int],
+        results: List[QuestionTopic],
+        query_vector: Optional[np.ndarray] = None,
+        cache_scope: Optional[Tuple] = None
+    ):
+        """Grava o resultado nos caches, exceto se o índice mudou desde o início da busca ('generation')."""
+        with self._results_cache_lock:
+            if generation != self._cache_generation:
+                return
+            if query_vector is not None:
+                self.search_cache.put(query_vector, results, scope=cache_scope)
+            self.results_cache[cache_key] = results
+
+    def search_questions(self, topic: str, amount: int = 15) -> List[QuestionTopic]:
         """
         Busca questões similares no Qdrant. 
         O parâmetro 'topic' do FastAPI agora é usado como query de busca.
         """
         
+        # 0. CACHE EXATO: a mesma busca (topic, amount) já foi respondida recentemente
+        cache_key = (topic, amount)
+        with self._results_cache_lock:
+            generation = self._cache_generation
+            cached_results = self.results_cache.get(cache_key)
+        if cached_results is not None:
+            return cached_results
+        
         # 1. ⬇️ ENRIQUECIMENTO DA QUERY: Adicionar contexto na busca
         try:
-            enriched_query_text = f"Questão do ENEM na área de {topic}"
+            enriched_query_text = self._get_enriched_query(topic)
             query_vector = embedding_model.generate_embedding(enriched_query_text)
         except Exception as e:
             print(f"ERRO CRÍTICO ao gerar embedding para a busca: {e}")
@@ -204,7 +546,6 @@ class QuestionService:
         
         # 2. APLICAÇÃO DO PAYLOAD FILTERING (Filtragem Estrutural)
         search_filter: Optional[Filter] = None
-        TARGET_TOPICS = ["linguagens", "ciencias-natureza", "ciencias-humanas", "matematica"]
         
         if topic.lower() in TARGET_TOPICS:
             # Se a query do usuário for um tópico exato, filtramos o índice.
@@ -216,6 +557,15 @@ class QuestionService:
                     )
                 ]
             )
+        
+        # 3. CACHE SEMÂNTICO: reaproveita o resultado de uma query equivalente já respondida.
+        # O tópico normalizado entra no escopo: todas as queries enriquecidas compartilham o mesmo prefixo,
+        # o que aproxima os embeddings de tópicos diferentes (ex.: "história" e "geografia") acima do limiar
+        cache_scope = (self._normalize_topic(topic), topic.lower() if search_filter else None, amount)
+        cached_results = self.search_cache.get(query_vector, scope=cache_scope)
+        if cached_results is not None:
+            self._cache_search_results(generation, cache_key, cached_results)
+            return cached_results
             
         try:
             # ⬇️ Usando search_points para compatibilidade com a versão 1.9.0 do Qdrant
@@ -225,21 +575,25 @@ class QuestionService:
                 query_filter=search_filter, # Aplica o filtro
                 limit=amount,
                 with_payload=True,
+                # Re-ranqueia os candidatos quantizados com os vetores originais (float32) para preservar o recall
+                search_params=SearchParams(
+                    hnsw_ef=self.HNSW_EF_SEARCH,
+                    exact=False,
+                    quantization=QuantizationSearchParams(
+                        rescore=True,
+                        oversampling=self.QUANTIZATION_OVERSAMPLING
+                    )
+                ),
             )
             
-            results = []
-            for hit in search_result:
-                question_data = hit.payload
-                
-                results.append({
-                    "id": question_data.get("id"),
-                    "text": question_data.get("statement"),
-                    "area": question_data.get("topic"),
-                    "alternatives": json.loads(question_data.get("alternatives")), 
-                    "correct_answer": question_data.get("correct_answer"),
-                    "score": hit.score
-                })
+            # Payloads gravados pelo próprio serviço (dados confiáveis): model_construct dispensa a validação
+            # por campo, e o FastAPI devolve a instância de QuestionTopic sem revalidá-la
+            results = [
+                QuestionTopic.model_construct(**dict(zip(_RESULT_FIELDS, (*_PAYLOAD_FIELDS(hit.payload), hit.score))))
+                for hit in search_result
+            ]
             
+            self._cache_search_results(generation, cache_key, results, query_vector=query_vector, cache_scope=cache_scope)
             return results
             
         except Exception as e:
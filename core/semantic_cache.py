@@ -0,0 +1,82 @@
+# core/semantic_cache.py
+import threading
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+from .embedding_model import EMBEDDING_SIZE
+
+# Similaridade de cosseno mínima para considerar duas queries equivalentes
+SIMILARITY_THRESHOLD = 0.95
+# Número máximo de queries mantidas em cache (eviction LRU)
+MAX_ENTRIES = 4096
+
+class SemanticCache:
+    """
+    Cache semântico em memória: guarda o embedding de cada query já respondida junto com o resultado.
+    Uma nova query reaproveita o resultado de uma anterior quando a similaridade de cosseno entre
+    os dois embeddings atinge o limiar 'threshold' e o escopo (ex.: filtro + quantidade) é o mesmo.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, threshold: float = SIMILARITY_THRESHOLD, dim: int = EMBEDDING_SIZE):
+        self.max_entries = max_entries
+        self.threshold = threshold
+
+        # Matriz C[N, dim] com os embeddings normalizados e listas paralelas de escopo/resultado
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._scopes: List[Hashable] = []
+        self._values: List[Any] = []
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def get(self, vector: List[float], scope: Hashable = None) -> Optional[Any]:
+        """Retorna o resultado em cache mais similar a 'vector' (dentro do mesmo escopo), ou None."""
+        v = self._normalize(vector)
+
+        with self._lock:
+            size = len(self._values)
+            if size == 0:
+                return None
+
+            sims = self._vectors[:size] @ v
+            for i in np.argsort(-sims):
+                if sims[i] < self.threshold:
+                    break
+                if self._scopes[i] == scope:
+                    self._tick += 1
+                    self._last_used[i] = self._tick
+                    return self._values[i]
+
+        return None
+
+    def put(self, vector: List[float], value: Any, scope: Hashable = None):
+        """Armazena o resultado de uma query, removendo a entrada menos usada se o cache estiver cheio."""
+        v = self._normalize(vector)
+
+        with self._lock:
+            if len(self._values) < self.max_entries:
+                i = len(self._values)
+                self._scopes.append(scope)
+                self._values.append(value)
+            else:
+                i = int(np.argmin(self._last_used))
+                self._scopes[i] = scope
+                self._values[i] = value
+
+            self._vectors[i] = v
+            self._tick += 1
+            self._last_used[i] = self._tick
+
+    def clear(self):
+        """Invalida todas as entradas (ex.: após inserir novas questões no índice)."""
+        with self._lock:
+            self._scopes.clear()
+            self._values.clear()
+            self._last_used[:] = 0
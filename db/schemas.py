@@ -1,11 +1,12 @@
 # db/schemas.py
 
 # Importações para Schemas Pydantic
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, TypedDict
 
 # ⬇️ Importações para o Modelo SQLAlchemy
-from sqlalchemy import Column, Integer, String, JSON
+from sqlalchemy import Integer, String, JSON
+from sqlalchemy.orm import Mapped, MappedAsDataclass, mapped_column
 # ⬇️ CHAVE: Importar Base do seu arquivo de configuração
 from .sql_db import Base 
 
@@ -13,19 +14,19 @@ from .sql_db import Base
 # 1. MODELO SQLAlchemy (DEFINE A TABELA)
 # ----------------------------------------------------
 
-class QuestionModel(Base):
-    """Modelo ORM do SQLAlchemy que representa a tabela 'questions' no banco de dados."""
+class QuestionModel(MappedAsDataclass, Base):
+    """Modelo ORM do SQLAlchemy que representa a tabela 'questions' no banco de dados (dataclass mapeada)."""
     
     # Define o nome da tabela
     __tablename__ = "questions"
 
-    # Define as Colunas da Tabela
-    id = Column(Integer, primary_key=True, index=True)
-    text = Column(String) # O texto da questão (statement)
-    area = Column(String) # A área/tópico
+    # Define as Colunas da Tabela (mesmo esquema de antes: colunas anuláveis, id autoincremento)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, init=False)
+    text: Mapped[Optional[str]] = mapped_column(String) # O texto da questão (statement)
+    area: Mapped[Optional[str]] = mapped_column(String) # A área/tópico
     # Usamos JSON/String para armazenar a lista de alternativas
-    alternatives = Column(JSON) 
-    correct_answer = Column(String) 
+    alternatives: Mapped[Optional[List[str]]] = mapped_column(JSON) 
+    correct_answer: Mapped[Optional[str]] = mapped_column(String) 
 
 # ----------------------------------------------------
 # 2. SCHEMAS Pydantic (DEFINE FORMATOS DE DADOS DA API)
@@ -39,12 +40,17 @@ class QuestionBase(BaseModel):
     alternatives: List[str] = Field(..., description="Lista de alternativas da questão.")
     correct_answer: str = Field(..., description="A alternativa correta.")
     
-    class Config:
-        from_attributes = True # Compatibilidade com ORM (QuestionModel acima)
+    model_config = ConfigDict(from_attributes=True) # Compatibilidade com ORM (QuestionModel acima)
 
-class QuestionInsert(QuestionBase):
-    """Schema para a inserção de novos dados (não precisa de ID)."""
-    pass
+class QuestionInsert(TypedDict):
+    """
+    Dados internos de uma questão a inserir (não precisa de ID): um dict simples, sem custo de validação.
+    Mesmos campos de QuestionBase; a validação acontece apenas na borda da API.
+    """
+    statement: str
+    topic: str
+    alternatives: List[str]
+    correct_answer: str
 
 class QuestionTopic(BaseModel):
     """Schema usado para retornar a busca de similaridade (RAG)."""
@@ -55,8 +61,7 @@ class QuestionTopic(BaseModel):
     correct_answer: str
     score: Optional[float] = Field(None, description="Pontuação de similaridade do Qdrant.")
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class QuestionSearch(BaseModel):
     """Schema de entrada para a busca da API."""
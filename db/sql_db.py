@@ -1,8 +1,8 @@
 # db/sql_db.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+import orjson
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 # ----------------------------------------------------
 # 1. CONFIGURAÇÃO DO ENGINE
@@ -10,18 +10,44 @@ from sqlalchemy.ext.declarative import declarative_base
 
 # Defina o Engine (o arquivo .db)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+
+def _orjson_dumps(value) -> str:
+    # O SQLAlchemy espera str do serializer; orjson.dumps devolve bytes
+    return orjson.dumps(value).decode()
+
 engine = create_engine(
     # check_same_thread=False é necessário apenas para SQLite, 
     # permitindo múltiplos threads (FastAPI) acessarem a mesma conexão.
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False},
+    # Linhas por INSERT ... VALUES nas inserções em massa (executemany com RETURNING)
+    insertmanyvalues_page_size=1000,
+    # Colunas JSON (ex.: alternatives) codificadas/decodificadas com orjson em vez do json da stdlib
+    json_serializer=_orjson_dumps,
+    json_deserializer=orjson.loads
 )
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Ajustes de desempenho aplicados a cada nova conexão SQLite:
+    WAL + synchronous=NORMAL (commit sem fsync a cada transação), temporários e cache em memória, e leitura via mmap.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
 # ----------------------------------------------------
 # 2. BASE E MAPEAMENTO
 # ----------------------------------------------------
 
-# Defina a Base para os modelos
-Base = declarative_base()
+# Defina a Base para os modelos (estilo declarativo do SQLAlchemy 2.0)
+class Base(DeclarativeBase):
+    pass
+
 from . import schemas
 
 # ----------------------------------------------------
@@ -1,10 +1,16 @@
 # db/vector_db.py
 from qdrant_client import QdrantClient, models
 from qdrant_client.models import Distance, VectorParams
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
 
 COLLECTION_NAME = "enem_questions"
 EMBEDDING_SIZE = 768 # Tamanho do embedding (ajuste se mudar o modelo)
+# A partir deste número de pontos num único insert, o HNSW é desligado durante o upsert e construído uma vez ao final
+BULK_INSERT_MIN_POINTS = 1000
+# Limiar de indexação padrão do Qdrant, restaurado após a inserção em massa
+INDEXING_THRESHOLD = 20000
 
 class VectorDBManager:
     """Gerencia a conexão e operações com o Qdrant In-Memory."""
@@ -15,37 +21,73 @@ class VectorDBManager:
 
     def ensure_collection_exists(self):
         """Cria a coleção se ela não existir, com os parâmetros corretos."""
-        collections = self.client.get_collections().collections
-        if COLLECTION_NAME not in [c.name for c in collections]:
+        if not self.client.collection_exists(COLLECTION_NAME):
             print(f"Creating Qdrant In-Memory collection: {COLLECTION_NAME}")
-            self.client.recreate_collection(
+            self.client.create_collection(
                 collection_name=COLLECTION_NAME,
                 vectors_config=VectorParams(size=EMBEDDING_SIZE, distance=Distance.COSINE),
+                # Quantização escalar int8: vetores ocupam 1/4 da RAM e a distância é calculada em int8
+                quantization_config=models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                ),
             )
 
-    def insert_vector(self, vector: List[float], q_id: str, payload: dict = None):
-        """Insere um novo vetor (embedding) no Qdrant."""
-        self.client.upsert(
+    def insert_vector(self, vector: np.ndarray, q_id: str, payload: dict = None):
+        """Insere um novo vetor (embedding float32) no Qdrant."""
+        self.insert_vectors([(q_id, vector, payload)])
+
+    def insert_vectors(self, items: List[Tuple[str, np.ndarray, Optional[dict]]]):
+        """Insere vários vetores no Qdrant com um único upsert. Cada item é (ID, vetor, payload)."""
+        if not items:
+            return
+        points = [
+            models.PointStruct(
+                id=q_id,
+                vector=vector,
+                payload=payload if payload is not None else {}
+            )
+            for q_id, vector, payload in items
+        ]
+        
+        if len(points) < BULK_INSERT_MIN_POINTS:
+            self.client.upsert(collection_name=COLLECTION_NAME, points=points)
+            return
+        
+        # Inserção em massa: adia a construção do HNSW para uma única passada sobre todos os pontos
+        self._set_indexing_threshold(0)
+        try:
+            self.client.upsert(collection_name=COLLECTION_NAME, points=points, wait=True)
+        finally:
+            self._set_indexing_threshold(INDEXING_THRESHOLD)
+
+    def _set_indexing_threshold(self, indexing_threshold: int):
+        """Ajusta o limiar de indexação HNSW da coleção (0 desliga a construção do índice)."""
+        self.client.update_collection(
             collection_name=COLLECTION_NAME,
-            points=[
-                models.PointStruct(
-                    id=q_id,
-                    vector=vector,
-                    payload=payload if payload is not None else {}
-                )
-            ]
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=indexing_threshold)
         )
 
-    def search_vectors(self, query_vector: List[float], limit: int) -> List[Tuple[str, float]]:
+    def search_vectors(self, query_vector: np.ndarray, limit: int) -> List[Tuple[str, float]]:
         """
         Busca vetores semelhantes à query.
         Retorna uma lista de tuplas (ID da Questão, Score de Similaridade).
         """
         search_result = self.client.search(
             collection_name=COLLECTION_NAME,
-            query_vector=query_vector,
-            limit=limit
+            query_vector=np.asarray(query_vector, dtype=np.float32),
+            limit=limit,
+            # Re-ranqueia os candidatos quantizados com os vetores originais (float32) para preservar o recall
+            search_params=models.SearchParams(
+                quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+            )
         )
         return [(str(hit.id), hit.score) for hit in search_result]
 
-vector_db_manager = VectorDBManager()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_vector_db() -> VectorDBManager:
+    """Instância única do VectorDBManager, criada no primeiro uso (e não na importação do módulo)."""
+    return VectorDBManager()